@@ -1,9 +1,46 @@
+from __future__ import annotations
+
 import argparse
+import functools
 import os
+import re
+from typing import TYPE_CHECKING
 from urllib.parse import parse_qs, urlparse
 
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.proxies import GenericProxyConfig
+if TYPE_CHECKING:
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+
+@functools.lru_cache(maxsize=1)
+def get_transcript_api(proxy_url: str) -> YouTubeTranscriptApi:
+    """Return a shared API client backed by one pooled, retrying HTTP session."""
+    # Imported lazily so --help and argument errors skip the ~200-300 ms
+    # requests/youtube_transcript_api import cost.
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+    from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api.proxies import GenericProxyConfig
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return YouTubeTranscriptApi(
+        proxy_config=GenericProxyConfig(
+            http_url=proxy_url,
+            https_url=proxy_url,
+        ),
+        http_client=session,
+    )
+
+
+_VIDEO_ID_RE = re.compile(
+    r"(?:youtu\.be/|youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/))([A-Za-z0-9_-]{11})"
+)
 
 
 def extract_video_id(video: str) -> str:
@@ -11,6 +48,10 @@ def extract_video_id(video: str) -> str:
     if "://" not in video and "/" not in video:
         return video
 
+    match = _VIDEO_ID_RE.search(video)
+    if match:
+        return match.group(1)
+
     parsed = urlparse(video)
     host = parsed.netloc.lower()
 
@@ -28,6 +69,27 @@ def extract_video_id(video: str) -> str:
     return video
 
 
+def fetch_and_write(video: str, output: str | None, proxy_url: str) -> str:
+    """Fetch a transcript and write it as plain text, returning the output path.
+
+    Importable entry point for in-process callers; avoids respawning the
+    interpreter (and re-importing youtube_transcript_api) per video.
+    """
+    video_id = extract_video_id(video)
+    if not video_id:
+        raise ValueError("Unable to determine video ID from video input.")
+
+    output_file = output or f"{video_id}.txt"
+
+    ytt_api = get_transcript_api(proxy_url)
+    chunks = ytt_api.fetch(video_id)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("".join(f"{chunk.text}\n" for chunk in chunks))
+
+    return output_file
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fetch YouTube video transcript")
     parser.add_argument(
@@ -42,27 +104,14 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    video_id = extract_video_id(args.video)
-    if not video_id:
-        raise SystemExit("Unable to determine video ID from --video input.")
-
-    output_file = args.output or f"{video_id}.txt"
-
     proxy_url = os.environ.get("OXY_PROXY_URL")
     if not proxy_url:
         raise SystemExit("Missing OXY_PROXY_URL environment variable.")
 
-    ytt_api = YouTubeTranscriptApi(
-        proxy_config=GenericProxyConfig(
-            http_url=proxy_url,
-            https_url=proxy_url,
-        )
-    )
-    chunks = ytt_api.fetch(video_id)
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        for chunk in chunks:
-            f.write(f"{chunk.text}\n")
+    try:
+        output_file = fetch_and_write(args.video, args.output, proxy_url)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
 
     print(f"Transcript saved to {output_file}")
 
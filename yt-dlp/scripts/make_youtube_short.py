@@ -4,11 +4,16 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import re
 import shlex
 import shutil
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -24,13 +29,149 @@ ANCHOR_CENTER_EXPR = {
     "right": "iw-ow/2",
 }
 
+ENCODER_CACHE = Path("~/.cache/yt-shorts/encoders.json").expanduser()
 
-def run(cmd: list[str], dry_run: bool = False) -> int:
+# Hardware H.264 encoders in preference order for --video-encoder auto.
+HW_H264_ENCODERS = ["h264_videotoolbox", "h264_nvenc", "h264_qsv"]
+
+
+def _encoder_works(encoder: str) -> bool:
+    """Test-encode one frame; compiled-in hardware encoders still fail at
+    runtime when the matching GPU or driver is absent."""
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        "nullsrc=s=256x256:d=0.1",
+        "-frames:v",
+        "1",
+        "-c:v",
+        encoder,
+        "-f",
+        "null",
+        "-",
+    ]
+    try:
+        completed = subprocess.run(
+            cmd,
+            check=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return False
+    return completed.returncode == 0
+
+
+def detect_h264_encoders() -> list[str]:
+    """Return the usable H.264 encoders of this ffmpeg build, cached on disk."""
+    try:
+        cached = json.loads(ENCODER_CACHE.read_text(encoding="utf-8"))
+        if isinstance(cached, dict) and isinstance(cached.get("usable"), list):
+            return cached["usable"]
+    except (OSError, ValueError):
+        pass
+
+    try:
+        completed = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return []
+    if completed.returncode != 0:
+        return []
+
+    compiled: list[str] = []
+    for line in completed.stdout.splitlines():
+        match = re.match(r"\s*V\S*\s+(\S+)", line)
+        if match and ("h264" in match.group(1) or match.group(1) == "libx264"):
+            compiled.append(match.group(1))
+
+    # Distro builds routinely list nvenc/qsv on machines without the hardware,
+    # so keep only encoders that survive a one-frame test encode.
+    usable = [name for name in compiled if _encoder_works(name)]
+
+    try:
+        ENCODER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        ENCODER_CACHE.write_text(json.dumps({"usable": usable}), encoding="utf-8")
+    except OSError:
+        pass  # Caching is best-effort; detection still worked.
+    return usable
+
+
+FILTER_CACHE = Path("~/.cache/yt-shorts/filters.json").expanduser()
+
+
+def detect_zscale() -> bool:
+    """Return whether this ffmpeg build ships the zimg-backed zscale filter."""
+    try:
+        cached = json.loads(FILTER_CACHE.read_text(encoding="utf-8"))
+        if isinstance(cached, dict) and isinstance(cached.get("zscale"), bool):
+            return cached["zscale"]
+    except (OSError, ValueError):
+        pass
+
+    try:
+        completed = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-filters"],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return False
+    if completed.returncode != 0:
+        return False
+
+    has_zscale = bool(re.search(r"\bzscale\b", completed.stdout))
+    try:
+        FILTER_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        FILTER_CACHE.write_text(json.dumps({"zscale": has_zscale}), encoding="utf-8")
+    except OSError:
+        pass  # Caching is best-effort; detection still worked.
+    return has_zscale
+
+
+def pick_video_encoder(choice: str) -> str:
+    if choice != "auto":
+        return choice
+    available = detect_h264_encoders()
+    for name in HW_H264_ENCODERS:
+        if name in available:
+            return name
+    return "libx264"
+
+
+def video_encoder_args(encoder: str, args: argparse.Namespace) -> list[str]:
+    if encoder == "h264_videotoolbox":
+        return ["-c:v", "h264_videotoolbox", "-b:v", args.video_bitrate]
+    if encoder == "h264_nvenc":
+        return ["-c:v", "h264_nvenc", "-preset", "p5", "-rc", "vbr", "-cq", str(args.video_crf)]
+    if encoder == "h264_qsv":
+        return ["-c:v", "h264_qsv", "-global_quality", str(args.video_crf)]
+    return ["-c:v", encoder, "-preset", args.video_preset, "-crf", str(args.video_crf)]
+
+
+def run(cmd: list[str], dry_run: bool = False, nice: int = 0) -> int:
     print("Command:")
     print(shlex.join(cmd))
     if dry_run:
         return 0
-    return subprocess.run(cmd, check=False).returncode
+
+    popen_kwargs: dict = {}
+    if nice > 0:
+        if os.name == "posix":
+            popen_kwargs["preexec_fn"] = lambda: os.nice(nice)
+        elif sys.platform == "win32":
+            popen_kwargs["creationflags"] = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    return subprocess.run(cmd, check=False, **popen_kwargs).returncode
 
 
 def resolve_yt_dlp_cmd() -> list[str] | None:
@@ -71,17 +212,46 @@ def parse_anchor_map(value: str, default_anchor: str) -> list[tuple[float, str]]
     return [(t, a) for (t, a) in parsed if not (t <= 0 and a == default_anchor)]
 
 
+def _parse_x_map_numpy(entries: list[str]) -> list[tuple[float, float]] | None:
+    """Bulk-parse x-map entries with numpy; None means fall back to the loop."""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    try:
+        arr = np.array([item.split(":", 1) for item in entries], dtype=np.float64)
+    except ValueError:
+        # Malformed numbers: let the loop path raise its per-entry error.
+        return None
+
+    pos = arr[:, 1]
+    out_of_range = (pos < 0.0) | (pos > 1.0)
+    if out_of_range.any():
+        raise ValueError(f"x-map position must be within [0.0, 1.0], got {float(pos[out_of_range][0])}")
+
+    order = np.argsort(arr[:, 0], kind="stable")
+    return [(float(arr[i, 0]), float(arr[i, 1])) for i in order]
+
+
 def parse_x_map(value: str) -> list[tuple[float, float]]:
     if not value:
         return []
 
-    parsed: list[tuple[float, float]] = []
-    for entry in value.split(","):
-        item = entry.strip()
-        if not item:
-            continue
+    entries = [item for item in (entry.strip() for entry in value.split(",")) if item]
+    for item in entries:
         if ":" not in item:
             raise ValueError(f"Invalid x-map entry: {item}")
+
+    # Typical maps have a handful of breakpoints, where the loop beats the
+    # numpy import; only bulk-parse the big ones.
+    if len(entries) > 8:
+        parsed_bulk = _parse_x_map_numpy(entries)
+        if parsed_bulk is not None:
+            return parsed_bulk
+
+    parsed: list[tuple[float, float]] = []
+    for item in entries:
         t_raw, pos_raw = item.split(":", 1)
         t = float(t_raw.strip())
         pos = float(pos_raw.strip())
@@ -94,28 +264,89 @@ def parse_x_map(value: str) -> list[tuple[float, float]]:
 
 
 def build_center_expr(default_anchor: str, anchor_map: list[tuple[float, str]], x_map: list[tuple[float, float]]) -> str:
-    expr = ANCHOR_CENTER_EXPR[default_anchor]
+    # Emit a flat mul-add chain: base + gte(t,t_i)*(v_i - v_{i-1}) + ...
+    # Each gte() term adds the delta to the previous value once its breakpoint
+    # passes, so ffmpeg evaluates a constant-depth expression per frame instead
+    # of walking a nested if() chain, and the string is built in one pass.
+    base = ANCHOR_CENTER_EXPR[default_anchor]
+    terms = [f"({base})"]
 
     if x_map:
+        prev_pos: float | None = None
         for t, pos in x_map:
-            expr = f"if(gte(t\\,{t})\\,{pos}*iw\\,{expr})"
-        return expr
-
+            if prev_pos is None:
+                terms.append(f"+gte(t\\,{t})*({pos}*iw-({base}))")
+            else:
+                terms.append(f"+gte(t\\,{t})*({pos - prev_pos}*iw)")
+            prev_pos = pos
+        return "".join(terms)
+
+    prev_expr = base
     for t, anchor in anchor_map:
-        expr = f"if(gte(t\\,{t})\\,{ANCHOR_CENTER_EXPR[anchor]}\\,{expr})"
-    return expr
+        expr = ANCHOR_CENTER_EXPR[anchor]
+        terms.append(f"+gte(t\\,{t})*(({expr})-({prev_expr}))")
+        prev_expr = expr
+    return "".join(terms)
 
 
 def build_x_expr(center_expr: str) -> str:
     return f"clip(({center_expr})-ow/2\\,0\\,iw-ow)"
 
 
+def write_sendcmd_script(script_path: Path, x_map: list[tuple[float, float]]) -> None:
+    """Write a sendcmd script that re-points crop x at each breakpoint.
+
+    The crop filter then evaluates only the last value it was sent, a single
+    constant-size expression per frame, instead of walking the whole breakpoint
+    chain baked into an inline x expression.
+    """
+    lines = [f"{t} crop x 'clip({pos}*iw-ow/2,0,iw-ow)';" for t, pos in x_map]
+    script_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
 def pick_downloaded_source(out_dir: Path) -> Path:
-    candidates = sorted(out_dir.glob("source.*"))
-    candidates = [p for p in candidates if p.suffix.lower() not in {".part", ".tmp"}]
-    if not candidates:
-        raise FileNotFoundError("No downloaded source file found (expected source.<ext>)")
-    return max(candidates, key=lambda p: p.stat().st_size)
+    # scandir hands back DirEntry objects whose stat() is cached from the
+    # directory read, so picking the largest candidate avoids per-file syscalls.
+    with os.scandir(out_dir) as entries:
+        candidates = [
+            entry
+            for entry in entries
+            if entry.name.startswith("source.")
+            and not entry.name.lower().endswith((".part", ".tmp"))
+        ]
+        if not candidates:
+            raise FileNotFoundError("No downloaded source file found (expected source.<ext>)")
+        return Path(max(candidates, key=lambda entry: entry.stat().st_size).path)
+
+
+FORMAT_CACHE_DIR = Path("~/.cache/yt-shorts/formats").expanduser()
+FORMAT_CACHE_TTL = 6 * 60 * 60  # Format availability shifts as tokens expire; 6 h is safe.
+
+
+def _format_cache_path(url: str) -> Path:
+    return FORMAT_CACHE_DIR / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+
+def load_cached_max_height(url: str) -> int | None:
+    try:
+        payload = json.loads(_format_cache_path(url).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if time.time() - payload.get("fetched_at", 0) > FORMAT_CACHE_TTL:
+        return None
+    max_height = payload.get("max_height")
+    return max_height if isinstance(max_height, int) else None
+
+
+def save_cached_max_height(url: str, max_height: int) -> None:
+    payload = {"url": url, "fetched_at": time.time(), "max_height": max_height}
+    try:
+        FORMAT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _format_cache_path(url).write_text(json.dumps(payload), encoding="utf-8")
+    except OSError:
+        pass  # The cache is best-effort; a failed write must not fail the run.
 
 
 def max_listed_height(
@@ -125,7 +356,12 @@ def max_listed_height(
     cookies_from_browser: str | None,
     dry_run: bool,
 ) -> int | None:
-    cmd = [*yt_dlp_cmd, "-F", "--extractor-args", extractor_args, url]
+    cached = load_cached_max_height(url)
+    if cached is not None:
+        print(f"Using cached max format height: {cached}p")
+        return cached
+
+    cmd = [*yt_dlp_cmd, "-J", "--skip-download", "--extractor-args", extractor_args, url]
     if cookies_from_browser:
         cmd[1:1] = ["--cookies-from-browser", cookies_from_browser]
 
@@ -138,13 +374,37 @@ def max_listed_height(
     if completed.returncode != 0:
         return None
 
-    heights = [int(v) for v in re.findall(r"\b(\d{3,4})p\b", completed.stdout)]
-    return max(heights) if heights else None
+    try:
+        try:
+            import orjson
+        except ImportError:
+            data = json.loads(completed.stdout)
+        else:
+            data = orjson.loads(completed.stdout)
+    except ValueError:
+        return None
+
+    # Playlist URLs nest the per-video metadata under "entries".
+    if isinstance(data, dict) and "entries" in data:
+        entries = data.get("entries") or []
+        data = entries[0] if entries else {}
+    formats = data.get("formats") if isinstance(data, dict) else None
+    if not formats:
+        return None
+
+    heights = [f["height"] for f in formats if isinstance(f.get("height"), int)]
+    if not heights:
+        return None
+
+    max_h = max(heights)
+    save_cached_max_height(url, max_h)
+    return max_h
 
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Create a YouTube Shorts-ready vertical cut")
-    p.add_argument("--url", required=True, help="YouTube/video URL")
+    p.add_argument("--url", action="append", default=[], help="YouTube/video URL (repeatable)")
+    p.add_argument("--batch-file", help="File with one URL per line ('#' comments allowed)")
     p.add_argument("--out-dir", default=".", help="Output folder")
     p.add_argument("--output", default="short_9x16.mp4", help="Output filename")
     p.add_argument("--start", type=float, default=0.0, help="Start time in seconds")
@@ -162,42 +422,74 @@ def build_parser() -> argparse.ArgumentParser:
         default="",
         help="Preferred time-based focal x positions in [0..1], e.g. '4:0.38,20:0.66'",
     )
+    p.add_argument(
+        "--x-map-mode",
+        choices=["expr", "sendcmd"],
+        default="expr",
+        help="Drive --x-map via an inline crop expression or a sendcmd script (O(1) per-frame lookup)",
+    )
     p.add_argument("--extractor-args", default="youtube:player_client=ios,android,web_safari", help="yt-dlp extractor args")
     p.add_argument("--download-format", default="bv*+ba/b", help="yt-dlp format selector")
     p.add_argument("--cookies-from-browser", help="Optional browser name for authenticated pulls")
-    p.add_argument("--video-crf", type=int, default=18, help="x264 CRF")
+    p.add_argument(
+        "--video-encoder",
+        choices=["auto", "libx264", "h264_videotoolbox", "h264_nvenc", "h264_qsv"],
+        default="auto",
+        help="H.264 encoder; 'auto' prefers an available hardware encoder",
+    )
+    p.add_argument(
+        "--scaler",
+        choices=["auto", "zscale", "swscale"],
+        default="auto",
+        help="Resize filter; 'auto' uses zscale when the ffmpeg build has zimg",
+    )
+    p.add_argument("--video-crf", type=int, default=18, help="x264 CRF (quality level for nvenc/qsv)")
     p.add_argument("--video-preset", default="slow", help="x264 preset")
+    p.add_argument("--video-bitrate", default="8M", help="Target bitrate for hardware encoders without CRF")
     p.add_argument("--audio-bitrate", default="192k", help="AAC bitrate")
+    p.add_argument(
+        "--faststart-mode",
+        choices=["rewrite", "fragmented", "skip"],
+        default="rewrite",
+        help=(
+            "moov placement: 'rewrite' re-muxes with +faststart (second output pass), "
+            "'fragmented' writes single-pass fragmented MP4 with moov up front, "
+            "'skip' leaves the moov at the end"
+        ),
+    )
+    p.add_argument(
+        "--pipe",
+        action="store_true",
+        help="Stream yt-dlp straight into ffmpeg (single-stream formats only; skips the source file on disk)",
+    )
+    p.add_argument("--nice", type=int, default=0, help="Run ffmpeg at lower priority (POSIX nice increment)")
+    p.add_argument("--ffmpeg-threads", type=int, default=0, help="Cap ffmpeg encode/filter threads (0 = auto)")
     p.add_argument("--dry-run", action="store_true", help="Print commands only")
     return p
 
 
-def main() -> int:
-    args = build_parser().parse_args()
-
-    yt_dlp_cmd = resolve_yt_dlp_cmd()
-    if yt_dlp_cmd is None:
-        print("yt-dlp is not installed (binary or python module).", file=sys.stderr)
-        return 127
-    if shutil.which("ffmpeg") is None and not args.dry_run:
-        print("ffmpeg is not installed or not on PATH.", file=sys.stderr)
-        return 127
+def read_batch_file(path: Path) -> list[str]:
+    urls: list[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        item = line.strip()
+        if item and not item.startswith("#"):
+            urls.append(item)
+    return urls
 
-    out_dir = Path(args.out_dir).expanduser()
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    anchor_map = parse_anchor_map(args.anchor_map, args.anchor)
-    x_map = parse_x_map(args.x_map)
-    if x_map and anchor_map:
-        print("Info: both --x-map and --anchor-map provided; using --x-map.", file=sys.stderr)
-    center_expr = build_center_expr(args.anchor, anchor_map, x_map)
-    x_expr = build_x_expr(center_expr)
+def download_source(
+    yt_dlp_cmd: list[str],
+    args: argparse.Namespace,
+    url: str,
+    work_dir: Path,
+) -> tuple[int, Path]:
+    work_dir.mkdir(parents=True, exist_ok=True)
 
-    max_h = max_listed_height(yt_dlp_cmd, args.url, args.extractor_args, args.cookies_from_browser, args.dry_run)
+    max_h = max_listed_height(yt_dlp_cmd, url, args.extractor_args, args.cookies_from_browser, args.dry_run)
     if max_h is not None and max_h <= 360:
         print("Warning: highest listed source format is 360p; output will be upscaled.", file=sys.stderr)
 
-    source_template = out_dir / "source.%(ext)s"
+    source_template = work_dir / "source.%(ext)s"
     dl_cmd = [
         *yt_dlp_cmd,
         "--newline",
@@ -209,33 +501,58 @@ def main() -> int:
         args.download_format,
         "-o",
         str(source_template),
-        args.url,
+        url,
     ]
     if args.cookies_from_browser:
         dl_cmd[1:1] = ["--cookies-from-browser", args.cookies_from_browser]
 
     rc = run(dl_cmd, args.dry_run)
     if rc != 0:
-        return rc
+        return rc, work_dir / "source.mp4"
 
-    source_path = out_dir / "source.mp4"
+    source_path = work_dir / "source.mp4"
     if not args.dry_run:
-        source_path = pick_downloaded_source(out_dir)
-
-    vf = (
-        f"scale=-2:{args.height}:flags=lanczos,"
-        f"crop={args.width}:{args.height}:{x_expr}:0,"
-        "unsharp=5:5:0.75:3:3:0.35,setsar=1,format=yuv420p"
-    )
-
-    output_path = out_dir / args.output
+        source_path = pick_downloaded_source(work_dir)
+    return 0, source_path
+
+
+def build_encode_cmd(args: argparse.Namespace, source: str, work_dir: Path, x_expr: str) -> tuple[list[str], Path]:
+    # zscale (zimg) resamples noticeably faster than swscale at equivalent
+    # lanczos quality, so prefer it when the build has it.
+    if args.use_zscale:
+        scale = f"zscale=-2:{args.height}:f=lanczos"
+    else:
+        scale = f"scale=-2:{args.height}:flags=lanczos"
+
+    if args.x_map_mode == "sendcmd" and args.parsed_x_map:
+        script_path = work_dir / "x_map.cmd"
+        if not args.dry_run:
+            write_sendcmd_script(script_path, args.parsed_x_map)
+        init_x = build_x_expr(ANCHOR_CENTER_EXPR[args.anchor])
+        vf = (
+            f"{scale},"
+            f"sendcmd=f='{script_path}',"
+            f"crop={args.width}:{args.height}:{init_x}:0,"
+            "unsharp=5:5:0.75:3:3:0.35,setsar=1,format=yuv420p"
+        )
+    else:
+        vf = (
+            f"{scale},"
+            f"crop={args.width}:{args.height}:{x_expr}:0,"
+            "unsharp=5:5:0.75:3:3:0.35,setsar=1,format=yuv420p"
+        )
+
+    output_path = work_dir / args.output
     ff_cmd = [
         "ffmpeg",
         "-y",
+        # Cap filter parallelism too, so lanczos+unsharp do not grab every core
+        # while the next download's ffmpeg (or the shell) is running.
+        *(["-filter_threads", str(args.ffmpeg_threads)] if args.ffmpeg_threads > 0 else []),
         "-ss",
         str(args.start),
         "-i",
-        str(source_path),
+        source,
         "-t",
         str(args.duration),
         "-map",
@@ -244,12 +561,7 @@ def main() -> int:
         "0:a:0?",
         "-vf",
         vf,
-        "-c:v",
-        "libx264",
-        "-preset",
-        args.video_preset,
-        "-crf",
-        str(args.video_crf),
+        *video_encoder_args(args.video_encoder, args),
         "-c:a",
         "aac",
         "-ar",
@@ -258,18 +570,82 @@ def main() -> int:
         "2",
         "-b:a",
         args.audio_bitrate,
-        "-movflags",
-        "+faststart",
-        str(output_path),
     ]
+    if args.ffmpeg_threads > 0:
+        ff_cmd.extend(["-threads", str(args.ffmpeg_threads)])
+    if args.faststart_mode == "rewrite":
+        ff_cmd.extend(["-movflags", "+faststart"])
+    elif args.faststart_mode == "fragmented":
+        # moov is written first, so ffmpeg skips the faststart re-mux pass.
+        ff_cmd.extend(["-movflags", "+frag_keyframe+empty_moov+default_base_moof"])
+    ff_cmd.append(str(output_path))
+    return ff_cmd, output_path
 
-    rc = run(ff_cmd, args.dry_run)
-    if rc != 0:
-        return rc
 
-    if args.dry_run:
-        return 0
+def encode_short(args: argparse.Namespace, source_path: Path, work_dir: Path, x_expr: str) -> tuple[int, Path]:
+    ff_cmd, output_path = build_encode_cmd(args, str(source_path), work_dir, x_expr)
+    return run(ff_cmd, args.dry_run, nice=args.nice), output_path
+
+
+def stream_short(
+    yt_dlp_cmd: list[str],
+    args: argparse.Namespace,
+    url: str,
+    work_dir: Path,
+    x_expr: str,
+) -> tuple[int, Path]:
+    """Pipe yt-dlp straight into ffmpeg so the source never touches disk."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    max_h = max_listed_height(yt_dlp_cmd, url, args.extractor_args, args.cookies_from_browser, args.dry_run)
+    if max_h is not None and max_h <= 360:
+        print("Warning: highest listed source format is 360p; output will be upscaled.", file=sys.stderr)
+
+    dl_cmd = [
+        *yt_dlp_cmd,
+        "--extractor-args",
+        args.extractor_args,
+        "-S",
+        "res,fps,codec:h264",
+        "-f",
+        args.download_format,
+        "-o",
+        "-",
+        url,
+    ]
+    if args.cookies_from_browser:
+        dl_cmd[1:1] = ["--cookies-from-browser", args.cookies_from_browser]
 
+    ff_cmd, output_path = build_encode_cmd(args, "pipe:0", work_dir, x_expr)
+
+    print("Command:")
+    print(f"{shlex.join(dl_cmd)} | {shlex.join(ff_cmd)}")
+    if args.dry_run:
+        return 0, output_path
+
+    popen_kwargs: dict = {}
+    if args.nice > 0 and os.name == "posix":
+        popen_kwargs["preexec_fn"] = lambda: os.nice(args.nice)
+
+    dl_proc = subprocess.Popen(dl_cmd, stdout=subprocess.PIPE)
+    assert dl_proc.stdout is not None
+    ff_proc = subprocess.Popen(ff_cmd, stdin=dl_proc.stdout, **popen_kwargs)
+    dl_proc.stdout.close()  # Let yt-dlp see the pipe break if ffmpeg exits.
+    ff_rc = ff_proc.wait()
+    dl_rc = dl_proc.wait()
+
+    # ffmpeg closes the pipe as soon as -t is satisfied, so on any source
+    # longer than the cut yt-dlp exits nonzero with a broken pipe even though
+    # the output is complete. ffmpeg's status is authoritative; only surface
+    # the downloader's failure when the output never materialized.
+    if ff_rc == 0 and dl_rc != 0:
+        if not output_path.exists() or output_path.stat().st_size == 0:
+            print(f"Warning: yt-dlp exited {dl_rc} and {output_path} is missing or empty.", file=sys.stderr)
+            return dl_rc, output_path
+    return ff_rc, output_path
+
+
+def probe_output(output_path: Path) -> int:
     probe_cmd = [
         "ffprobe",
         "-v",
@@ -287,5 +663,133 @@ def main() -> int:
     return subprocess.run(probe_cmd, check=False).returncode
 
 
+def main() -> int:
+    args = build_parser().parse_args()
+
+    urls = list(args.url)
+    if args.batch_file:
+        batch_path = Path(args.batch_file).expanduser()
+        if not batch_path.exists():
+            print(f"Batch file not found: {batch_path}", file=sys.stderr)
+            return 2
+        urls.extend(read_batch_file(batch_path))
+    if not urls:
+        print("No URLs given; use --url and/or --batch-file.", file=sys.stderr)
+        return 2
+
+    yt_dlp_cmd = resolve_yt_dlp_cmd()
+    if yt_dlp_cmd is None:
+        print("yt-dlp is not installed (binary or python module).", file=sys.stderr)
+        return 127
+    if shutil.which("ffmpeg") is None and not args.dry_run:
+        print("ffmpeg is not installed or not on PATH.", file=sys.stderr)
+        return 127
+
+    if args.dry_run and args.video_encoder == "auto":
+        # Dry runs print commands only: no encoder listing, no test encodes,
+        # no cache writes. Show the portable libx264 form.
+        args.video_encoder = "libx264"
+    else:
+        args.video_encoder = pick_video_encoder(args.video_encoder)
+    if args.video_encoder != "libx264":
+        print(f"Info: using hardware encoder {args.video_encoder}.", file=sys.stderr)
+    # zscale can still fail at runtime (e.g. zimg's "no path between
+    # colorspaces" on sources without tagged color properties), so --scaler
+    # swscale must always be able to force the safe path past the cached probe.
+    if args.scaler == "auto":
+        args.use_zscale = detect_zscale() if not args.dry_run else False
+    else:
+        args.use_zscale = args.scaler == "zscale"
+
+    out_dir = Path(args.out_dir).expanduser()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    anchor_map = parse_anchor_map(args.anchor_map, args.anchor)
+    x_map = parse_x_map(args.x_map)
+    if x_map and anchor_map:
+        print("Info: both --x-map and --anchor-map provided; using --x-map.", file=sys.stderr)
+    center_expr = build_center_expr(args.anchor, anchor_map, x_map)
+    x_expr = build_x_expr(center_expr)
+    args.parsed_x_map = x_map
+
+    # One subfolder per URL keeps source.* files apart; a single URL keeps the
+    # flat layout so existing callers see unchanged paths.
+    if len(urls) == 1:
+        jobs = [(urls[0], out_dir)]
+    else:
+        jobs = [(url, out_dir / f"short_{i:02d}") for i, url in enumerate(urls, start=1)]
+
+    pipe = args.pipe
+    if pipe and "+" in args.download_format:
+        print(
+            "Info: --pipe needs a single-stream format selector (no '+ merge'); "
+            "falling back to disk download.",
+            file=sys.stderr,
+        )
+        pipe = False
+
+    overall_rc = 0
+    outputs: list[Path] = []
+
+    if pipe:
+        # The pipe itself overlaps download and encode, so run jobs in order.
+        for url, work_dir in jobs:
+            rc, output_path = stream_short(yt_dlp_cmd, args, url, work_dir, x_expr)
+            if rc != 0:
+                print(f"Streaming encode failed for {url} (exit {rc}).", file=sys.stderr)
+                overall_rc = overall_rc or rc
+                continue
+            outputs.append(output_path)
+
+        if args.dry_run:
+            return overall_rc
+        for output_path in outputs:
+            rc = probe_output(output_path)
+            overall_rc = overall_rc or rc
+        return overall_rc
+
+    # Downloads are network-bound and encodes are CPU-bound, so overlap them:
+    # while one ffmpeg runs, the next download proceeds. The encode pool has a
+    # single slot so at most one ffmpeg competes for cores at a time.
+    with ThreadPoolExecutor(max_workers=2) as dl_pool, ThreadPoolExecutor(max_workers=1) as ff_pool:
+        dl_futures = [dl_pool.submit(download_source, yt_dlp_cmd, args, url, work_dir) for url, work_dir in jobs]
+        encode_futures = []
+        for (url, work_dir), dl_future in zip(jobs, dl_futures):
+            try:
+                rc, source_path = dl_future.result()
+            except Exception as exc:
+                # e.g. pick_downloaded_source finding no source.* file; one
+                # bad URL must not kill the rest of the batch.
+                print(f"Download failed for {url}: {exc}", file=sys.stderr)
+                overall_rc = overall_rc or 1
+                continue
+            if rc != 0:
+                print(f"Download failed for {url} (exit {rc}).", file=sys.stderr)
+                overall_rc = overall_rc or rc
+                continue
+            encode_futures.append((url, ff_pool.submit(encode_short, args, source_path, work_dir, x_expr)))
+
+        for url, encode_future in encode_futures:
+            try:
+                rc, output_path = encode_future.result()
+            except Exception as exc:
+                print(f"Encode failed for {url}: {exc}", file=sys.stderr)
+                overall_rc = overall_rc or 1
+                continue
+            if rc != 0:
+                print(f"Encode failed for {url} (exit {rc}).", file=sys.stderr)
+                overall_rc = overall_rc or rc
+                continue
+            outputs.append(output_path)
+
+    if args.dry_run:
+        return overall_rc
+
+    for output_path in outputs:
+        rc = probe_output(output_path)
+        overall_rc = overall_rc or rc
+    return overall_rc
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
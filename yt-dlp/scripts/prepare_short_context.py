@@ -4,30 +4,92 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
-import shlex
-import subprocess
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib.parse import parse_qs, urlparse
 
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.proxies import GenericProxyConfig
+if TYPE_CHECKING:
+    from youtube_transcript_api import YouTubeTranscriptApi
 
 
-def run(cmd: list[str], dry_run: bool = False) -> int:
-    print("Command:")
-    print(shlex.join(cmd))
-    if dry_run:
-        return 0
-    return subprocess.run(cmd, check=False).returncode
+CACHE_DIR = Path("~/.cache/yt-transcripts").expanduser()
+
+
+@functools.lru_cache(maxsize=1)
+def get_transcript_api(proxy_url: str) -> YouTubeTranscriptApi:
+    """Return a shared API client backed by one pooled, retrying HTTP session."""
+    # Imported lazily so --help, --dry-run, and cache hits skip the
+    # ~200-300 ms requests/youtube_transcript_api import cost.
+    import requests
+    from requests.adapters import HTTPAdapter, Retry
+    from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api.proxies import GenericProxyConfig
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return YouTubeTranscriptApi(
+        proxy_config=GenericProxyConfig(
+            http_url=proxy_url,
+            https_url=proxy_url,
+        ),
+        http_client=session,
+    )
+
+
+def load_cached_chunks(video_id: str) -> list[dict] | None:
+    cache_path = CACHE_DIR / f"{video_id}.json"
+    if not cache_path.exists():
+        return None
+    try:
+        payload = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    chunks = payload.get("chunks")
+    return chunks if isinstance(chunks, list) else None
+
+
+def save_cached_chunks(video_id: str, chunks: list[dict]) -> None:
+    payload = {
+        "video_id": video_id,
+        "fetched_at": time.time(),
+        "chunks": chunks,
+    }
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path = CACHE_DIR / f"{video_id}.json"
+        cache_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass  # The cache is best-effort; a failed write must not fail the run.
+
+
+_VIDEO_ID_RE = re.compile(
+    r"(?:youtu\.be/|youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/))([A-Za-z0-9_-]{11})"
+)
 
 
 def extract_video_id(video: str) -> str:
     if "://" not in video and "/" not in video:
         return video
 
+    match = _VIDEO_ID_RE.search(video)
+    if match:
+        return match.group(1)
+
     parsed = urlparse(video)
     host = parsed.netloc.lower()
 
@@ -45,15 +107,21 @@ def extract_video_id(video: str) -> str:
     return video
 
 
+def read_urls_file(path: Path) -> list[str]:
+    urls: list[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        item = line.strip()
+        if item and not item.startswith("#"):
+            urls.append(item)
+    return urls
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Prepare transcript context for AI-led Shorts decisions")
-    p.add_argument("--url", required=True, help="YouTube URL or video ID")
+    p.add_argument("--url", action="append", default=[], help="YouTube URL or video ID (repeatable)")
+    p.add_argument("--urls-file", help="File with one URL per line ('#' comments allowed)")
+    p.add_argument("--jobs", type=int, default=4, help="Concurrent transcript fetches for multi-URL runs")
     p.add_argument("--out-dir", default=".", help="Output directory")
-    p.add_argument(
-        "--fetch-script",
-        default="~/.codex/skills/fetch-youtube-transcript/scripts/yt_transcript.py",
-        help="Path to fetch-youtube-transcript script",
-    )
     p.add_argument(
         "--plain-name",
         default="{video_id}_transcript.txt",
@@ -64,68 +132,110 @@ def build_parser() -> argparse.ArgumentParser:
         default="{video_id}_transcript_timed.jsonl",
         help="Timed transcript filename template",
     )
-    p.add_argument("--skip-plain", action="store_true", help="Skip running fetch-youtube-transcript script")
-    p.add_argument("--dry-run", action="store_true", help="Print commands and intended outputs only")
+    p.add_argument("--skip-plain", action="store_true", help="Skip writing the plain transcript file")
+    p.add_argument("--no-cache", action="store_true", help="Ignore the local transcript cache")
+    p.add_argument("--dry-run", action="store_true", help="Print intended outputs only")
     return p
 
 
-def main() -> int:
-    args = build_parser().parse_args()
-
-    out_dir = Path(args.out_dir).expanduser()
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    video_id = extract_video_id(args.url)
+def process_video(args: argparse.Namespace, out_dir: Path, url: str) -> int:
+    video_id = extract_video_id(url)
     if not video_id:
-        print("Unable to determine YouTube video ID.", file=sys.stderr)
+        print(f"Unable to determine YouTube video ID for: {url}", file=sys.stderr)
         return 2
 
     plain_path = out_dir / args.plain_name.format(video_id=video_id)
     timed_path = out_dir / args.timed_name.format(video_id=video_id)
 
-    fetch_script = Path(args.fetch_script).expanduser()
-    if not args.skip_plain:
-        if not fetch_script.exists():
-            print(f"fetch-youtube-transcript script not found: {fetch_script}", file=sys.stderr)
-            return 2
-        rc = run([sys.executable, str(fetch_script), "--video", args.url, "--output", str(plain_path)], args.dry_run)
-        if rc != 0:
-            return rc
-
     if args.dry_run:
+        if not args.skip_plain:
+            print(f"Would write plain transcript to: {plain_path}")
         print(f"Would write timed transcript to: {timed_path}")
         return 0
 
-    proxy_url = os.environ.get("OXY_PROXY_URL")
-    if not proxy_url:
-        print("Missing OXY_PROXY_URL environment variable.", file=sys.stderr)
-        return 2
-
-    api = YouTubeTranscriptApi(
-        proxy_config=GenericProxyConfig(
-            http_url=proxy_url,
-            https_url=proxy_url,
-        )
-    )
-    chunks = api.fetch(video_id)
-
-    with open(timed_path, "w", encoding="utf-8") as f:
-        for c in chunks:
-            start = float(c.start)
-            duration = float(c.duration)
-            row = {
-                "start": start,
-                "duration": duration,
-                "end": start + duration,
-                "text": c.text,
+    try:
+        chunks = None if args.no_cache else load_cached_chunks(video_id)
+        if chunks is None:
+            proxy_url = os.environ.get("OXY_PROXY_URL")
+            if not proxy_url:
+                print("Missing OXY_PROXY_URL environment variable.", file=sys.stderr)
+                return 2
+
+            api = get_transcript_api(proxy_url)
+            chunks = [
+                {"start": float(c.start), "duration": float(c.duration), "text": c.text}
+                for c in api.fetch(video_id)
+            ]
+            save_cached_chunks(video_id, chunks)
+        else:
+            print(f"Using cached transcript: {CACHE_DIR / f'{video_id}.json'}")
+
+        if not args.skip_plain:
+            with open(plain_path, "w", encoding="utf-8") as f:
+                f.write("".join(f"{c['text']}\n" for c in chunks))
+
+        rows = [
+            {
+                "start": c["start"],
+                "duration": c["duration"],
+                "end": c["start"] + c["duration"],
+                "text": c["text"],
             }
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            for c in chunks
+        ]
+
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+
+        if orjson is not None:
+            with open(timed_path, "wb") as f:
+                f.write(b"".join(orjson.dumps(row) + b"\n" for row in rows))
+        else:
+            with open(timed_path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+    except Exception as exc:
+        # TranscriptsDisabled, NoTranscriptFound, network errors: report the
+        # URL and keep going so one bad video cannot abort a batch run.
+        print(f"Transcript fetch failed for {url}: {exc}", file=sys.stderr)
+        return 1
 
-    print(f"Plain transcript: {plain_path}")
+    if not args.skip_plain:
+        print(f"Plain transcript: {plain_path}")
     print(f"Timed transcript: {timed_path}")
     print(f"Chunks: {len(chunks)}")
     return 0
 
 
+def main() -> int:
+    args = build_parser().parse_args()
+
+    urls = list(args.url)
+    if args.urls_file:
+        urls_path = Path(args.urls_file).expanduser()
+        if not urls_path.exists():
+            print(f"URLs file not found: {urls_path}", file=sys.stderr)
+            return 2
+        urls.extend(read_urls_file(urls_path))
+    if not urls:
+        print("No URLs given; use --url and/or --urls-file.", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out_dir).expanduser()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if len(urls) == 1:
+        return process_video(args, out_dir, urls[0])
+
+    # Transcript fetches are network-bound, so threads overlap the proxy
+    # round-trips; the memoized API client keeps them on one connection pool.
+    overall_rc = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for rc in pool.map(functools.partial(process_video, args, out_dir), urls):
+            overall_rc = overall_rc or rc
+    return overall_rc
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -4,10 +4,13 @@
 from __future__ import annotations
 
 import argparse
+import json
+import re
 import shlex
 import shutil
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
 
@@ -32,6 +35,12 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--subs-langs", default="en.*", help="Subtitle languages pattern")
     parser.add_argument("--playlist-items", help="Playlist item range, e.g. 1-20")
     parser.add_argument("--playlist-end", type=int, help="Last playlist index to download")
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Concurrent yt-dlp workers for playlist mode (playlist is pre-resolved and split)",
+    )
     parser.add_argument("--rate-limit", help="Rate limit, e.g. 2M")
     parser.add_argument("--archive-file", help="Path to download archive file")
     parser.add_argument("--cookies-from-browser", help="Browser name for auth cookies")
@@ -45,7 +54,7 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def build_command(args: argparse.Namespace) -> list[str]:
+def build_base_command(args: argparse.Namespace, rate_limit: str | None = None) -> list[str]:
     out_dir = Path(args.out_dir).expanduser()
     output = out_dir / args.filename_template
 
@@ -54,8 +63,10 @@ def build_command(args: argparse.Namespace) -> list[str]:
     if args.no_playlist:
         cmd.append("--no-playlist")
 
-    if args.rate_limit:
-        cmd.extend(["--limit-rate", args.rate_limit])
+    if rate_limit is None:
+        rate_limit = args.rate_limit
+    if rate_limit:
+        cmd.extend(["--limit-rate", rate_limit])
 
     if args.archive_file:
         cmd.extend(["--download-archive", args.archive_file])
@@ -75,6 +86,12 @@ def build_command(args: argparse.Namespace) -> list[str]:
     if args.write_info_json:
         cmd.append("--write-info-json")
 
+    return cmd
+
+
+def build_command(args: argparse.Namespace) -> list[str]:
+    cmd = build_base_command(args)
+
     if args.mode == "inspect":
         cmd.extend(["--no-download", "-F"])
     elif args.mode == "video":
@@ -97,6 +114,87 @@ def build_command(args: argparse.Namespace) -> list[str]:
     return cmd
 
 
+def split_rate_limit(rate_limit: str | None, workers: int) -> str | None:
+    """Divide a yt-dlp rate limit like '2M' across workers, best effort."""
+    if not rate_limit or workers <= 1:
+        return rate_limit
+    match = re.fullmatch(r"([\d.]+)([KkMmGg]?)", rate_limit)
+    if not match:
+        return rate_limit
+    value = float(match.group(1)) / workers
+    return f"{value:g}{match.group(2)}"
+
+
+def resolve_playlist_urls(args: argparse.Namespace, dry_run: bool) -> list[str] | None:
+    cmd = ["yt-dlp", "-J", "--flat-playlist"]
+    if args.cookies_from_browser:
+        cmd.extend(["--cookies-from-browser", args.cookies_from_browser])
+    if args.proxy:
+        cmd.extend(["--proxy", args.proxy])
+    if args.playlist_items:
+        cmd.extend(["--playlist-items", args.playlist_items])
+    if args.playlist_end:
+        cmd.extend(["--playlist-end", str(args.playlist_end)])
+    cmd.append(args.url)
+
+    print("Command:")
+    print(shlex.join(cmd))
+    if dry_run:
+        return []
+
+    completed = subprocess.run(cmd, check=False, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None
+    try:
+        data = json.loads(completed.stdout)
+    except ValueError:
+        return None
+
+    entries = data.get("entries") if isinstance(data, dict) else None
+    urls = [e.get("url") or e.get("webpage_url") for e in entries or [] if isinstance(e, dict)]
+    return [u for u in urls if u]
+
+
+def run_parallel_playlist(args: argparse.Namespace) -> int:
+    urls = resolve_playlist_urls(args, args.dry_run)
+    if urls is None:
+        print("Failed to resolve playlist entries.", file=sys.stderr)
+        return 1
+    if args.dry_run:
+        print(f"Would download playlist entries with {args.parallel} parallel workers.")
+        return 0
+    if not urls:
+        print("Playlist resolved to no entries.", file=sys.stderr)
+        return 1
+
+    workers = min(args.parallel, len(urls))
+    buckets: list[list[str]] = [urls[i::workers] for i in range(workers)]
+    rate_limit = split_rate_limit(args.rate_limit, workers)
+
+    with tempfile.TemporaryDirectory(prefix="yt-dlp-batches-") as tmp_dir:
+        procs = []
+        for i, bucket in enumerate(buckets):
+            batch_file = Path(tmp_dir) / f"batch_{i}.txt"
+            batch_file.write_text("\n".join(bucket) + "\n", encoding="utf-8")
+            # Entry URLs point at single videos, so each worker runs the plain
+            # video flow over its batch; playlist selection already happened
+            # during the flat resolve.
+            cmd = build_base_command(args, rate_limit=rate_limit)
+            cmd.extend(["-f", args.video_format, "-a", str(batch_file)])
+            if args.extra_arg:
+                cmd.extend(args.extra_arg)
+            print("Command:")
+            print(shlex.join(cmd))
+            procs.append(subprocess.Popen(cmd))
+
+        # Wait on every worker before leaving the context: the batch files
+        # must outlive all of them, and each exit code must be collected.
+        rc = 0
+        for proc in procs:
+            rc = proc.wait() or rc
+    return rc
+
+
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
@@ -107,6 +205,9 @@ def main() -> int:
     out_dir = Path(args.out_dir).expanduser()
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.mode == "playlist" and args.parallel > 1:
+        return run_parallel_playlist(args)
+
     cmd = build_command(args)
     print("Command:")
     print(shlex.join(cmd))